@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 import sys
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 MOD = 100
+CHUNK_SIZE = 1 << 20
 
 def parse(data: str):
     ops = []
@@ -58,7 +64,110 @@ def part2(ops):
         pos = (pos + step * n) % MOD
     return hits
 
+def _chunk_py(lines, pos):
+    hits1 = hits2 = 0
+    for line in lines:
+        d = line[:1]
+        n = int(line[1:])
+        if d == b"R":
+            hits2 += zeros_during_rotation(pos, "R", n)
+            pos = (pos + n) % MOD
+        elif d == b"L":
+            hits2 += zeros_during_rotation(pos, "L", n)
+            pos = (pos - n) % MOD
+        else:
+            raise ValueError(f"Bad direction: {line.decode(errors='replace')}")
+        if pos == 0:
+            hits1 += 1
+    return pos, hits1, hits2
+
+
+def zeros_during_rotation_batch(pos, right, dist):
+    """Elementwise zeros_during_rotation over arrays (right: bool mask for "R")."""
+    t = np.where(right, -pos % MOD, pos % MOD)
+    t[t == 0] = MOD  # from 0, you hit 0 again after 100 clicks
+    return np.where(dist >= t, 1 + (dist - t) // MOD, 0)
+
+
+def batch_totals(dirs, dists, start=50):
+    """
+    Vectorized part1/part2 over arrays of directions ("L"/"R" as str, bytes
+    or byte codes) and distances. Returns (part1, part2, final position); the
+    totals are identical to part1/part2 on the same operations.
+    """
+    dirs = np.asarray(dirs)
+    if dirs.dtype.kind == "U":
+        right, left = dirs == "R", dirs == "L"
+    elif dirs.dtype.kind == "S":
+        right, left = dirs == b"R", dirs == b"L"
+    else:
+        right, left = dirs == ord("R"), dirs == ord("L")
+    if not np.all(right | left):
+        bad = dirs[np.argmin(right | left)].item()
+        if isinstance(bad, int):
+            bad = chr(bad)
+        elif isinstance(bad, bytes):
+            bad = bad.decode(errors="replace")
+        raise ValueError(f"Bad direction: {bad}")
+    dist = np.asarray(dists, dtype=np.int64)
+    if dirs.shape != dist.shape:
+        raise ValueError(f"Got {len(dirs)} directions but {len(dist)} distances")
+    if len(dist) == 0:
+        return 0, 0, start
+
+    # Position prefix; reducing steps mod MOD first keeps the cumsum small.
+    steps = np.where(right, dist, -dist) % MOD
+    after = (start + np.cumsum(steps)) % MOD
+    before = np.empty_like(after)
+    before[0] = start
+    before[1:] = after[:-1]
+
+    crossings = zeros_during_rotation_batch(before, right, dist)
+    return int(np.count_nonzero(after == 0)), int(crossings.sum()), int(after[-1])
+
+
+def _chunk_np(lines, pos):
+    dirs = np.frombuffer(b"".join(line[:1] for line in lines), dtype=np.uint8)
+    dists = [int(line[1:]) for line in lines]
+    hits1, hits2, pos = batch_totals(dirs, dists, pos)
+    return pos, hits1, hits2
+
+
+def solve_stream(stream, chunk_size=CHUNK_SIZE):
+    """
+    Both parts in one pass over a binary stream, reading fixed-size chunks so
+    memory stays bounded however long the rotation log is. Each chunk of whole
+    lines is handled by a NumPy kernel when available, else line by line.
+    """
+    process = _chunk_np if np is not None else _chunk_py
+    pos = 50
+    hits1 = hits2 = 0
+    tail = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        chunk = tail + chunk
+        cut = chunk.rfind(b"\n") + 1
+        tail = chunk[cut:]
+        lines = chunk[:cut].split()
+        if lines:
+            pos, h1, h2 = process(lines, pos)
+            hits1 += h1
+            hits2 += h2
+    lines = tail.split()
+    if lines:
+        pos, h1, h2 = process(lines, pos)
+        hits1 += h1
+        hits2 += h2
+    return hits1, hits2
+
+
 if __name__ == "__main__":
+    if "--stream" in sys.argv:
+        for answer in solve_stream(sys.stdin.buffer):
+            print(answer)
+        sys.exit()
     data = sys.stdin.read()
     ops = parse(data)
     print(part1(ops))
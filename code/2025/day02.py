@@ -1,7 +1,8 @@
 from __future__ import annotations
 import sys
+import heapq
 from bisect import bisect_left, bisect_right
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
 def parse_ranges(text: str) -> List[Tuple[int, int]]:
     text = text.strip()
@@ -58,6 +59,113 @@ def sum_in_ranges(sorted_vals: List[int], ranges: List[Tuple[int, int]]) -> int:
         total += pref[hi] - pref[lo]
     return total
 
+def _sum_periodic(lo: int, hi: int, length: int, period: int) -> int:
+    # Sum of length-digit numbers in [lo, hi] whose digits repeat with this period:
+    # exactly x * (10^length - 1) / (10^period - 1) for period-digit x.
+    rep = (10 ** length - 1) // (10 ** period - 1)
+    x_lo = max(10 ** (period - 1), -(-lo // rep))
+    x_hi = min(10 ** period - 1, hi // rep)
+    if x_lo > x_hi:
+        return 0
+    return rep * (x_lo + x_hi) * (x_hi - x_lo + 1) // 2
+
+
+def _squarefree_divisors(n: int) -> List[Tuple[int, int]]:
+    # (d, mobius(d)) for every squarefree divisor d > 1 of n.
+    primes = [p for p in range(2, n + 1) if n % p == 0 and all(p % q for q in range(2, p))]
+    out = []
+    for mask in range(1, 1 << len(primes)):
+        d = 1
+        for i, p in enumerate(primes):
+            if mask >> i & 1:
+                d *= p
+        out.append((d, -1 if bin(mask).count("1") % 2 else 1))
+    return out
+
+
+def sum_invalid_in_range(a: int, b: int, exactly_twice: bool) -> int:
+    """
+    Closed-form version of summing gen_invalid_numbers over [a, b]: an arithmetic
+    series per (length, period), with Mobius inclusion-exclusion over periods so a
+    number like 111111 is counted once in the "at least twice" variant.
+    """
+    total = 0
+    a = max(a, 1)
+    for length in range(len(str(a)), len(str(b)) + 1 if b >= a else 0):
+        lo = max(a, 10 ** (length - 1))
+        hi = min(b, 10 ** length - 1)
+        if exactly_twice:
+            if length % 2 == 0:
+                total += _sum_periodic(lo, hi, length, length // 2)
+            continue
+        # Numbers repeating with some proper period = union over primes q | length
+        # of those with period length / q.
+        for d, mu in _squarefree_divisors(length):
+            total -= mu * _sum_periodic(lo, hi, length, length // d)
+    return total
+
+
+def merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    out: List[Tuple[int, int]] = []
+    for a, b in sorted(ranges):
+        if out and a <= out[-1][1] + 1:
+            if b > out[-1][1]:
+                out[-1] = (out[-1][0], b)
+        else:
+            out.append((a, b))
+    return out
+
+
+def _periodic_stream(rep: int, x_lo: int, x_hi: int, twice: bool) -> Iterator[Tuple[int, bool]]:
+    for x in range(x_lo, x_hi + 1):
+        yield x * rep, twice
+
+
+def iter_invalid(lo: int, hi: int) -> Iterator[Tuple[int, bool]]:
+    """
+    Yield (v, repeated_exactly_twice) for every number in [lo, hi] made of a
+    digit-sequence repeated at least twice, in increasing order. Candidates are
+    produced lazily per digit length, and only for lengths inside the range.
+    """
+    lo = max(lo, 1)
+    if lo > hi:
+        return
+    for length in range(len(str(lo)), len(str(hi)) + 1):
+        seg_lo = max(lo, 10 ** (length - 1))
+        seg_hi = min(hi, 10 ** length - 1)
+        streams = []
+        for period in range(1, length // 2 + 1):
+            if length % period:
+                continue
+            rep = (10 ** length - 1) // (10 ** period - 1)
+            x_lo = max(10 ** (period - 1), -(-seg_lo // rep))
+            x_hi = min(10 ** period - 1, seg_hi // rep)
+            streams.append(_periodic_stream(rep, x_lo, x_hi, 2 * period == length))
+
+        # Periods overlap (e.g. 1111 has periods 1 and 2); emit each value once.
+        prev, prev_twice = None, False
+        for v, twice in heapq.merge(*streams):
+            if v == prev:
+                prev_twice = prev_twice or twice
+                continue
+            if prev is not None:
+                yield prev, prev_twice
+            prev, prev_twice = v, twice
+        if prev is not None:
+            yield prev, prev_twice
+
+
+def sum_invalid_streaming(ranges: List[Tuple[int, int]]) -> Tuple[int, int]:
+    # Both parts in one pass over the merged ranges; overlapping ranges count once.
+    total1 = total2 = 0
+    for a, b in merge_ranges(ranges):
+        for v, twice in iter_invalid(a, b):
+            total2 += v
+            if twice:
+                total1 += v
+    return total1, total2
+
+
 def main() -> None:
     text = sys.stdin.read().strip()
     ranges = parse_ranges(text)
@@ -65,6 +173,17 @@ def main() -> None:
         print("No ranges found on stdin.")
         return
 
+    if "--stream" in sys.argv:
+        ans1, ans2 = sum_invalid_streaming(ranges)
+        print(ans1)
+        print(ans2)
+        return
+
+    if "--closed" in sys.argv:
+        print(sum(sum_invalid_in_range(a, b, exactly_twice=True) for a, b in ranges))
+        print(sum(sum_invalid_in_range(a, b, exactly_twice=False) for a, b in ranges))
+        return
+
     max_b = max(b for _, b in ranges)
     max_digits = len(str(max_b))
 
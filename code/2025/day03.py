@@ -50,7 +50,50 @@ def best_k_digits(s: str, k: int) -> int:
     st = st[:k]
     return int("".join(st))
 
+def best_digits_bytes(line: bytes, k: int, stack: bytearray) -> tuple[int, int]:
+    # One pass over the raw bytes giving (best_two_digits, best_k_digits).
+    # stack holds at least k bytes and is reused across banks.
+    if k <= 0:
+        return 0, 0
+    n = len(line)
+    size = 0
+    lead = 0  # largest digit byte so far
+    best2 = 0
+    for i, ch in enumerate(line):
+        # Pairs need a nonzero tens digit, as in best_two_digits.
+        if lead > 48 and 10 * lead + ch - 528 > best2:
+            best2 = 10 * lead + ch - 528
+        if ch > lead:
+            lead = ch
+        # Pop smaller digits only while enough of the line is left to refill to k.
+        left = n - i
+        while size and stack[size - 1] < ch and size + left > k:
+            size -= 1
+        if size < k:
+            stack[size] = ch
+            size += 1
+    return best2, int(stack[:size]) if size else 0
+
+def solve_stream(stream, k: int = 12) -> tuple[int, int]:
+    # Banks stay bytes end to end; stream is a binary file such as sys.stdin.buffer.
+    stack = bytearray(k)
+    total1 = 0
+    total2 = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        two, many = best_digits_bytes(line, k, stack)
+        total1 += two
+        total2 += many
+    return total1, total2
+
 def main() -> None:
+    if "--stream" in sys.argv:
+        total1, total2 = solve_stream(sys.stdin.buffer)
+        print(total1)
+        print(total2)
+        return
     lines = [ln.strip() for ln in sys.stdin.read().splitlines() if ln.strip()]
     total1 = 0
     total2 = 0
@@ -1,5 +1,6 @@
 from __future__ import annotations
 import sys
+from array import array
 from collections import deque
 from typing import List, Tuple, Set
 
@@ -76,9 +77,136 @@ def total_removed(grid: List[str]) -> int:
 
     return removed
 
+# Byte table turning a row into a binary literal: "@" -> "1", anything else -> "0".
+_PAPER_BITS = bytes(49 if b == ord("@") else 48 for b in range(256))
+
+
+def grid_to_bits(grid: List[str]) -> Tuple[int, int]:
+    """Pack the whole map into one int, row stride w + 1 with a zero guard bit
+    between rows so horizontal shifts never wrap. Returns (bits, stride)."""
+    w = len(grid[0]) if grid else 0
+    rows = [row[:w].ljust(w, ".").encode().translate(_PAPER_BITS) + b"0" for row in grid]
+    bits = int(b"".join(rows), 2) if rows and w else 0
+    return bits, w + 1
+
+
+def crowded_bits(papers: int, stride: int) -> int:
+    """Cells with at least 4 of their 8 neighbours set, via a bit-sliced adder."""
+    planes: List[int] = []
+    for shift in (1, stride - 1, stride, stride + 1):
+        for nb in (papers << shift, papers >> shift):
+            carry = nb
+            for i in range(len(planes)):
+                planes[i], carry = planes[i] ^ carry, planes[i] & carry
+            if carry:
+                planes.append(carry)
+    # Bit planes are 1, 2, 4, 8; a count >= 4 sets plane 2 or plane 3.
+    return (planes[2] if len(planes) > 2 else 0) | (planes[3] if len(planes) > 3 else 0)
+
+
+def count_accessible_bits(grid: List[str]) -> int:
+    papers, stride = grid_to_bits(grid)
+    return (papers & ~crowded_bits(papers, stride)).bit_count()
+
+
+def total_removed_bits(grid: List[str]) -> int:
+    # Peel every removable roll at once, round after round; removals only lower
+    # neighbour counts, so this reaches the same fixed point as the queue.
+    papers, stride = grid_to_bits(grid)
+    removed = 0
+    while True:
+        removable = papers & ~crowded_bits(papers, stride)
+        if not removable:
+            return removed
+        removed += removable.bit_count()
+        papers &= ~removable
+
+
+def _peel_flat(grid: List[str], record_waves: bool) -> Tuple[int, array]:
+    h = len(grid)
+    w = len(grid[0]) if h else 0
+    # Flat indices into a grid padded by one empty cell on every side, so the
+    # eight neighbour offsets never need bounds checks.
+    stride = w + 2
+    size = (h + 2) * stride
+    papers = bytearray(size)
+    for r in range(h):
+        row = grid[r]
+        base = (r + 1) * stride + 1
+        for c in range(w):
+            if row[c] == "@":
+                papers[base + c] = 1
+    offsets = (-stride - 1, -stride, -stride + 1, -1, 1, stride - 1, stride, stride + 1)
+
+    neigh_cnt = bytearray(size)
+    queued = bytearray(size)
+    wave_of = array("i", bytes(4 * size)) if record_waves else array("i")
+    current = array("i")
+    for i in range(size):
+        if papers[i]:
+            neigh_cnt[i] = sum(papers[i + d] for d in offsets)
+            if neigh_cnt[i] < 4:
+                queued[i] = 1
+                current.append(i)
+
+    # Each pass over `current` is one wave: rolls removable once the previous
+    # wave is gone. `queued` keeps a cell from being enqueued twice.
+    removed = 0
+    wave = 1
+    while current:
+        nxt = array("i")
+        for i in current:
+            papers[i] = 0
+            removed += 1
+            if record_waves:
+                wave_of[i] = wave
+            for d in offsets:
+                j = i + d
+                if papers[j] and not queued[j]:
+                    neigh_cnt[j] -= 1
+                    if neigh_cnt[j] < 4:
+                        queued[j] = 1
+                        nxt.append(j)
+        current = nxt
+        wave += 1
+
+    waves = array("i")
+    if record_waves:
+        for r in range(h):
+            base = (r + 1) * stride + 1
+            waves.extend(wave_of[base : base + w])
+    return removed, waves
+
+
+def total_removed_flat(grid: List[str]) -> int:
+    return _peel_flat(grid, record_waves=False)[0]
+
+
+def removal_waves(grid: List[str]) -> array:
+    """Wave in which each cell's roll is removed (1 = initially accessible, 0 = never),
+    as a flat array indexed by r * w + c."""
+    return _peel_flat(grid, record_waves=True)[1]
+
+
 def main() -> None:
     text = sys.stdin.read()
     grid = parse_grid(text)
+    if "--waves" in sys.argv:
+        # Removal schedule: one "wave,row,col" line per removed roll, in wave order.
+        w = len(grid[0]) if grid else 0
+        waves = removal_waves(grid)
+        for i in sorted((i for i in range(len(waves)) if waves[i]), key=lambda i: waves[i]):
+            print(f"{waves[i]},{i // w},{i % w}")
+        return
+    if "--flat" in sys.argv:
+        waves = removal_waves(grid)
+        print(sum(1 for v in waves if v == 1))
+        print(sum(1 for v in waves if v))
+        return
+    if "--bits" in sys.argv:
+        print(count_accessible_bits(grid))
+        print(total_removed_bits(grid))
+        return
     print(count_accessible_initial(grid))
     print(total_removed(grid))
 
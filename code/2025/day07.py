@@ -27,6 +27,33 @@ def parse(lines: list[str]) -> tuple[int, int, int, dict[int, list[int]]]:
 	return start_row, start_col, width, cols
 
 
+def find_start(lines: list[str]) -> tuple[int, int]:
+	for r, line in enumerate(lines):
+		c = line.find("S")
+		if c != -1:
+			return r, c
+	raise ValueError("Start S not found")
+
+
+def parse_rows(lines: list[str]) -> tuple[int, int, int, list[tuple[int, list[int]]]]:
+	"""Like parse, but returns (row, sorted splitter cols) for rows below the start."""
+	height = len(lines)
+	width = len(lines[0]) if height else 0
+	start_row, start_col = find_start(lines)
+
+	rows: list[tuple[int, list[int]]] = []
+	for r in range(start_row + 1, height):
+		line = lines[r]
+		row_cols: list[int] = []
+		c = line.find("^")
+		while c != -1:
+			row_cols.append(c)
+			c = line.find("^", c + 1)
+		if row_cols:
+			rows.append((r, row_cols))
+	return start_row, start_col, width, rows
+
+
 def count_splits(lines: list[str]) -> int:
 	start_row, start_col, width, cols = parse(lines)
 	splits = 0
@@ -119,12 +146,73 @@ def count_timelines(lines: list[str]) -> int:
 	return exit_count
 
 
+# Byte table turning a row into a binary literal: "^" -> "1", anything else -> "0".
+_SPLITTER_BITS = bytes(49 if b == ord("^") else 48 for b in range(256))
+
+
+def count_splits_sweep(lines: list[str]) -> int:
+	"""Row-by-row version of count_splits with beams and splitters as int bitmasks."""
+	start_row, start_col = find_start(lines)
+	width = len(lines[0])
+	full = (1 << width) - 1
+	# Column c is bit (width - 1 - c); shifting either way is symmetric, so no reversal.
+	beams = 1 << (width - 1 - start_col)
+	splits = 0
+
+	for r in range(start_row + 1, len(lines)):
+		line = lines[r]
+		if "^" not in line:
+			continue
+		row = line[:width].ljust(width, ".")
+		splitters = int(row.encode().translate(_SPLITTER_BITS), 2)
+		hits = beams & splitters
+		done = hits
+		side = 0
+		# Side beams landing on a splitter in the same row split there too.
+		while hits:
+			splits += hits.bit_count()
+			spread = ((hits << 1) | (hits >> 1)) & full
+			side |= spread
+			hits = spread & splitters & ~done
+			done |= hits
+		beams = (beams | side) & ~splitters
+
+	return splits
+
+
+def count_timelines_sweep(lines: list[str]) -> int:
+	"""Row-by-row version of count_timelines; linear in width plus splitter count."""
+	_, start_col, width, rows = parse_rows(lines)
+	counts = [0] * width
+	counts[start_col] = 1
+	exit_count = 0
+
+	for row, row_cols in rows:
+		splitters = set(row_cols)
+		for c in row_cols:
+			cnt = counts[c]
+			if cnt == 0:
+				continue
+			counts[c] = 0
+			for ncol in (c - 1, c + 1):
+				if not 0 <= ncol < width:
+					exit_count += cnt
+				elif ncol in splitters:
+					raise ValueError(f"Beam loops between adjacent splitters in row {row}")
+				else:
+					counts[ncol] += cnt
+
+	# Whatever is still travelling down leaves through the bottom.
+	return exit_count + sum(counts)
+
+
 def main() -> None:
 	lines = sys.stdin.read().splitlines()
+	sweep = "--sweep" in sys.argv
 	if "--part2" in sys.argv:
-		print(count_timelines(lines))
+		print(count_timelines_sweep(lines) if sweep else count_timelines(lines))
 	else:
-		print(count_splits(lines))
+		print(count_splits_sweep(lines) if sweep else count_splits(lines))
 
 
 if __name__ == "__main__":
@@ -1,7 +1,14 @@
 from __future__ import annotations
 
 import sys
-from typing import List, Tuple
+import heapq
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
 
 
 def parse_points(lines: List[str]) -> List[Tuple[int, int, int]]:
@@ -17,6 +24,9 @@ def parse_points(lines: List[str]) -> List[Tuple[int, int, int]]:
 def k_shortest_edges(points: List[Tuple[int, int, int]], k: int) -> List[Tuple[int, int, int]]:
 	"""Return the first k edges (dist2, i, j) sorted by increasing distance squared."""
 
+	if np is not None and _fits_int64(points):
+		return _k_shortest_edges_np(points, k)
+
 	edges: List[Tuple[int, int, int]] = []
 	n = len(points)
 	for i in range(n):
@@ -33,6 +43,182 @@ def k_shortest_edges(points: List[Tuple[int, int, int]], k: int) -> List[Tuple[i
 	return edges[:k]
 
 
+def _fits_int64(points: List[Tuple[int, int, int]]) -> bool:
+	"""True when every squared distance between the points fits in an int64."""
+	if not points:
+		return True
+	span = max(max(p[a] for p in points) - min(p[a] for p in points) for a in range(3))
+	return 3 * span * span < 2**63
+
+
+def _k_shortest_edges_np(points: List[Tuple[int, int, int]], k: int, tile: int = 512) -> List[Tuple[int, int, int]]:
+	"""Tiled NumPy version of k_shortest_edges; peak memory is O(k + tile^2)."""
+
+	n = len(points)
+	if k <= 0 or n < 2:
+		return []
+
+	pts = np.array(points, dtype=np.int64)
+	cand_d2 = np.empty(0, dtype=np.int64)
+	cand_i = np.empty(0, dtype=np.int64)
+	cand_j = np.empty(0, dtype=np.int64)
+	threshold = None
+
+	for a in range(0, n, tile):
+		block_a = pts[a : a + tile]
+		ia = np.arange(a, a + len(block_a))
+		for c in range(a, n, tile):
+			block_c = pts[c : c + tile]
+			jc = np.arange(c, c + len(block_c))
+
+			d2 = np.zeros((len(block_a), len(block_c)), dtype=np.int64)
+			for axis in range(3):
+				diff = block_a[:, axis, None] - block_c[None, :, axis]
+				d2 += diff * diff
+
+			mask = ia[:, None] < jc[None, :]
+			if threshold is not None:
+				mask &= d2 <= threshold
+			ti, tj = np.nonzero(mask)
+			if len(ti) == 0:
+				continue
+
+			cand_d2 = np.concatenate((cand_d2, d2[ti, tj]))
+			cand_i = np.concatenate((cand_i, ia[ti]))
+			cand_j = np.concatenate((cand_j, jc[tj]))
+			if len(cand_d2) <= k:
+				continue
+
+			# Keep the k smallest by (dist2, i, j); ties at the cut go to the lowest (i, j),
+			# matching the stable sort over generation order.
+			threshold = cand_d2[np.argpartition(cand_d2, k - 1)[k - 1]]
+			below = np.flatnonzero(cand_d2 < threshold)
+			tied = np.flatnonzero(cand_d2 == threshold)
+			tied = tied[np.lexsort((cand_j[tied], cand_i[tied]))[: k - len(below)]]
+			keep = np.concatenate((below, tied))
+			cand_d2, cand_i, cand_j = cand_d2[keep], cand_i[keep], cand_j[keep]
+
+	order = np.lexsort((cand_j, cand_i, cand_d2))[:k]
+	return [(int(d), int(i), int(j)) for d, i, j in zip(cand_d2[order], cand_i[order], cand_j[order])]
+
+
+class KDTree:
+	"""Static k-d tree over 3D points answering k-nearest-neighbour queries."""
+
+	LEAF_SIZE = 8
+
+	def __init__(self, points: List[Tuple[int, int, int]]) -> None:
+		self.points = points
+		self.order = list(range(len(points)))
+		# Node layout: (lo, hi, axis, split, left, right); leaves use axis == -1.
+		self.nodes: List[Tuple[int, int, int, int, int, int]] = []
+		if points:
+			self._build(0, len(points))
+
+	def _build(self, lo: int, hi: int) -> int:
+		node_id = len(self.nodes)
+		self.nodes.append((lo, hi, -1, 0, -1, -1))
+		if hi - lo <= self.LEAF_SIZE:
+			return node_id
+
+		# Split on the axis with the widest spread.
+		pts = self.points
+		seg = self.order[lo:hi]
+		spreads = [max(pts[i][a] for i in seg) - min(pts[i][a] for i in seg) for a in range(3)]
+		axis = spreads.index(max(spreads))
+		seg.sort(key=lambda i: pts[i][axis])
+		self.order[lo:hi] = seg
+
+		mid = (lo + hi) // 2
+		split = pts[seg[mid - lo]][axis]
+		left = self._build(lo, mid)
+		right = self._build(mid, hi)
+		self.nodes[node_id] = (lo, hi, axis, split, left, right)
+		return node_id
+
+	def nearest(self, i: int, m: int) -> List[Tuple[int, int]]:
+		"""Return the m nearest neighbours of point i as (dist2, j), sorted by (dist2, j)."""
+		pts = self.points
+		order = self.order
+		nodes = self.nodes
+		q = pts[i]
+		qx, qy, qz = q
+
+		# Max-heap of (-dist2, -j): the root is the worst candidate kept so far.
+		best: List[Tuple[int, int]] = []
+		stack: List[Tuple[int, int]] = [(0, 0)] if nodes else []
+		while stack:
+			node_id, plane_d2 = stack.pop()
+			if len(best) == m and plane_d2 > -best[0][0]:
+				continue
+			lo, hi, axis, split, left, right = nodes[node_id]
+			if axis == -1:
+				for j in order[lo:hi]:
+					if j == i:
+						continue
+					xj, yj, zj = pts[j]
+					dx = qx - xj
+					dy = qy - yj
+					dz = qz - zj
+					key = (-(dx * dx + dy * dy + dz * dz), -j)
+					if len(best) < m:
+						heapq.heappush(best, key)
+					elif key > best[0]:
+						heapq.heapreplace(best, key)
+				continue
+
+			diff = q[axis] - split
+			near, far = (left, right) if diff < 0 else (right, left)
+			# Far side first so the near side is popped (and tightens the bound) first.
+			stack.append((far, diff * diff))
+			stack.append((near, plane_d2))
+
+		return sorted((-nd, -nj) for nd, nj in best)
+
+
+def iter_edges(points: List[Tuple[int, int, int]]) -> Iterator[Tuple[int, int, int]]:
+	"""Yield every edge (dist2, i, j) with i < j in increasing (dist2, i, j) order.
+
+	Each point streams its neighbours nearest-first from a k-d tree; a heap merges
+	those streams, so only the prefix of edges actually consumed is ever built.
+	"""
+
+	n = len(points)
+	if n < 2:
+		return
+
+	tree = KDTree(points)
+	neigh = [tree.nearest(i, min(4, n - 1)) for i in range(n)]
+	cursor = [0] * n
+
+	# Every edge shows up in the streams of both endpoints; keying on (dist2, lo, hi)
+	# keeps the merge order identical to a stable sort, and only the lo side emits.
+	heap: List[Tuple[int, int, int, int]] = []
+	for i in range(n):
+		d2, j = neigh[i][0]
+		heap.append((d2, min(i, j), max(i, j), i))
+	heapq.heapify(heap)
+
+	while heap:
+		d2, a, b, i = heap[0]
+		if a == i:
+			yield d2, a, b
+
+		cursor[i] += 1
+		if cursor[i] == len(neigh[i]):
+			if cursor[i] == n - 1:
+				heapq.heappop(heap)
+				continue
+			neigh[i] = tree.nearest(i, min(2 * cursor[i], n - 1))
+		d2, j = neigh[i][cursor[i]]
+		heapq.heapreplace(heap, (d2, min(i, j), max(i, j), i))
+
+
+def k_shortest_edges_kdtree(points: List[Tuple[int, int, int]], k: int) -> List[Tuple[int, int, int]]:
+	"""Same result as k_shortest_edges, without materializing all O(n^2) edges."""
+	return list(islice(iter_edges(points), k))
+
+
 class DSU:
 	def __init__(self, n: int) -> None:
 		self.parent = list(range(n))
@@ -54,24 +240,117 @@ class DSU:
 		self.size[ra] += self.size[rb]
 
 
-def last_merge_product(lines: List[str]) -> int:
+def _max_mst_edge_py(points: List[Tuple[int, int, int]]) -> Tuple[int, int, int]:
+	n = len(points)
+	best: List[Optional[Tuple[int, int, int]]] = [None] * n
+	rest = list(range(1, n))
+	u = 0
+	result = (-1, 0, 0)
+	while rest:
+		ux, uy, uz = points[u]
+		pick: Optional[Tuple[int, int, int]] = None
+		pick_pos = -1
+		for pos, v in enumerate(rest):
+			xv, yv, zv = points[v]
+			dx = ux - xv
+			dy = uy - yv
+			dz = uz - zv
+			dist2 = dx * dx + dy * dy + dz * dz
+			cand = (dist2, u, v) if u < v else (dist2, v, u)
+			b = best[v]
+			if b is None or cand < b:
+				best[v] = b = cand
+			if pick is None or b < pick:
+				pick = b
+				pick_pos = pos
+
+		assert pick is not None
+		u = rest[pick_pos]
+		rest[pick_pos] = rest[-1]
+		rest.pop()
+		if pick > result:
+			result = pick
+	return result
+
+
+def _max_mst_edge_np(points: List[Tuple[int, int, int]]) -> Tuple[int, int, int]:
+	pts = np.array(points, dtype=np.int64)
+	n = len(points)
+	idx = np.arange(n)
+	in_tree = np.zeros(n, dtype=bool)
+	big = np.iinfo(np.int64).max
+	best_d2 = np.full(n, big, dtype=np.int64)
+	best_lo = np.zeros(n, dtype=np.int64)
+	best_hi = np.zeros(n, dtype=np.int64)
+
+	u = 0
+	in_tree[u] = True
+	result = (-1, 0, 0)
+	for _ in range(n - 1):
+		diff = pts - pts[u]
+		d2 = np.einsum("ij,ij->i", diff, diff)
+		lo = np.minimum(idx, u)
+		hi = np.maximum(idx, u)
+		# Lexicographic (dist2, lo, hi) comparison, same total order as the stable sort.
+		better = (d2 < best_d2) | ((d2 == best_d2) & ((lo < best_lo) | ((lo == best_lo) & (hi < best_hi))))
+		better &= ~in_tree
+		best_d2[better] = d2[better]
+		best_lo[better] = lo[better]
+		best_hi[better] = hi[better]
+
+		masked = np.where(in_tree, big, best_d2)
+		tied = np.flatnonzero(masked == masked.min())
+		u = int(min(tied, key=lambda v: (best_lo[v], best_hi[v])))
+		in_tree[u] = True
+		pick = (int(best_d2[u]), int(best_lo[u]), int(best_hi[u]))
+		if pick > result:
+			result = pick
+	return result
+
+
+def max_mst_edge(points: List[Tuple[int, int, int]]) -> Tuple[int, int, int]:
+	"""Return the largest edge (dist2, i, j) of the Euclidean MST via dense Prim.
+
+	Ties are broken on (dist2, i, j), so this is exactly the edge that completes
+	the Kruskal merge in last_merge_product. O(n^2) time, O(n) memory.
+	"""
+
+	if len(points) < 2:
+		return (-1, 0, 0)
+	if np is not None and _fits_int64(points):
+		return _max_mst_edge_np(points)
+	return _max_mst_edge_py(points)
+
+
+def last_merge_product(lines: List[str], engine: str = "brute") -> int:
 	points = parse_points(lines)
 	n = len(points)
 	if n == 0:
 		return 0
 
-	edges: List[Tuple[int, int, int]] = []
-	for i in range(n):
-		xi, yi, zi = points[i]
-		for j in range(i + 1, n):
-			xj, yj, zj = points[j]
-			dx = xi - xj
-			dy = yi - yj
-			dz = zi - zj
-			dist2 = dx * dx + dy * dy + dz * dz
-			edges.append((dist2, i, j))
+	if engine == "mst":
+		dist2, i, j = max_mst_edge(points)
+		if dist2 < 0:
+			return 0
+		return points[i][0] * points[j][0]
 
-	edges.sort(key=lambda t: t[0])
+	edges: Iterator[Tuple[int, int, int]] | List[Tuple[int, int, int]]
+	if engine == "kdtree":
+		# Stream edges lazily; we stop consuming at the final merge.
+		edges = iter_edges(points)
+	else:
+		edges = []
+		for i in range(n):
+			xi, yi, zi = points[i]
+			for j in range(i + 1, n):
+				xj, yj, zj = points[j]
+				dx = xi - xj
+				dy = yi - yj
+				dz = zi - zj
+				dist2 = dx * dx + dy * dy + dz * dz
+				edges.append((dist2, i, j))
+
+		edges.sort(key=lambda t: t[0])
 
 	dsu = DSU(n)
 	components = n
@@ -89,13 +368,16 @@ def last_merge_product(lines: List[str]) -> int:
 	return 0
 
 
-def solve(lines: List[str], k: int) -> int:
+def solve(lines: List[str], k: int, engine: str = "brute") -> int:
 	points = parse_points(lines)
 	n = len(points)
 	if n == 0:
 		return 0
 
-	edges = k_shortest_edges(points, k)
+	if engine == "kdtree":
+		edges = k_shortest_edges_kdtree(points, k)
+	else:
+		edges = k_shortest_edges(points, k)
 
 	dsu = DSU(n)
 	for _, i, j in edges:
@@ -114,11 +396,16 @@ def solve(lines: List[str], k: int) -> int:
 
 def main() -> None:
 	lines = sys.stdin.read().splitlines()
+	engine = "brute"
+	if "--kdtree" in sys.argv:
+		engine = "kdtree"
+	elif "--mst" in sys.argv:
+		engine = "mst"
 	if "--part2" in sys.argv:
-		print(last_merge_product(lines))
+		print(last_merge_product(lines, engine))
 	else:
 		# Part 1: connect the 1000 shortest pairs.
-		print(solve(lines, 1000))
+		print(solve(lines, 1000, engine))
 
 
 if __name__ == "__main__":
@@ -1,7 +1,14 @@
 from __future__ import annotations
 
 import sys
-from typing import List, Tuple
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 def parse_points(lines: List[str]) -> List[Tuple[int, int]]:
@@ -27,6 +34,61 @@ def max_rectangle_area(points: List[Tuple[int, int]]) -> int:
     return best
 
 
+def staircase(points: List[Tuple[int, int]], sx: int, sy: int) -> List[Tuple[int, int]]:
+    # Points not dominated in direction (sx, sy): one corner of the orthogonal hull.
+    ordered = sorted(points, key=lambda p: (-sx * p[0], -sy * p[1]))
+    out: List[Tuple[int, int]] = []
+    best_y = None
+    for x, y in ordered:
+        if best_y is None or sy * y > best_y:
+            best_y = sy * y
+            out.append((x, y))
+    return out
+
+
+def max_pair_area(a: List[Tuple[int, int]], b: List[Tuple[int, int]]) -> int:
+    if not a or not b:
+        return 0
+    xs = [x for x, _ in a + b]
+    ys = [y for _, y in a + b]
+    span = (max(xs) - min(xs) + 1) * (max(ys) - min(ys) + 1)
+    if np is not None and span < 2**63:
+        bx = np.array([x for x, _ in b], dtype=np.int64)
+        by = np.array([y for _, y in b], dtype=np.int64)
+        best = 0
+        for start in range(0, len(a), 1024):
+            chunk = np.array(a[start : start + 1024], dtype=np.int64)
+            w = np.abs(chunk[:, 0, None] - bx[None, :]) + 1
+            h = np.abs(chunk[:, 1, None] - by[None, :]) + 1
+            best = max(best, int((w * h).max()))
+        return best
+
+    best = 0
+    for x1, y1 in a:
+        for x2, y2 in b:
+            area = (abs(x1 - x2) + 1) * (abs(y1 - y2) + 1)
+            if area > best:
+                best = area
+    return best
+
+
+def max_rectangle_area_hull(points: List[Tuple[int, int]]) -> int:
+    """Same result as max_rectangle_area, pairing only orthogonal-hull points.
+
+    If q lies up-right of p, swapping q for a point that dominates it only grows
+    the rectangle, so the best pair joins the lower-left and upper-right
+    staircases (or upper-left and lower-right). The convex hull alone is not
+    enough here because of the +1 tile terms.
+    """
+
+    if len(points) < 2:
+        return 0
+    return max(
+        max_pair_area(staircase(points, -1, -1), staircase(points, 1, 1)),
+        max_pair_area(staircase(points, -1, 1), staircase(points, 1, -1)),
+    )
+
+
 def on_segment(px: int, py: int, ax: int, ay: int, bx: int, by: int) -> bool:
     return min(ax, bx) <= px <= max(ax, bx) and min(ay, by) <= py <= max(ay, by)
 
@@ -109,9 +171,245 @@ def rectangle_inside(poly: List[Tuple[int, int]], rect_corners: List[Tuple[int,
     return True
 
 
-def max_rectangle_area_rg(points: List[Tuple[int, int]]) -> int:
+class EdgeTree:
+    """Segment tree over axis-parallel edges (key, lo, hi), sorted by key.
+
+    Each node keeps the spans of its edges sorted by lo, with a running max of
+    hi, plus its his sorted, so "does any edge in this key range stab v" and
+    "how many span v" cost O(log^2 n) in O(n log n) memory.
+    """
+
+    def __init__(self, edges: List[Tuple[int, int, int]]) -> None:
+        self.keys = [key for key, _, _ in edges]
+        size = 1
+        while size < len(edges):
+            size *= 2
+        self.size = size
+        spans: List[List[Tuple[int, int]]] = [[] for _ in range(2 * size)]
+        for i, (_, lo, hi) in enumerate(edges):
+            spans[size + i] = [(lo, hi)]
+        for node in range(size - 1, 0, -1):
+            spans[node] = sorted(spans[2 * node] + spans[2 * node + 1])
+        self.los = [[lo for lo, _ in node] for node in spans]
+        self.his = [sorted(hi for _, hi in node) for node in spans]
+        self.reach = [list(accumulate((hi for _, hi in node), max)) for node in spans]
+
+    def _nodes(self, i: int, j: int):
+        # Nodes exactly covering edges [i, j).
+        i += self.size
+        j += self.size
+        while i < j:
+            if i & 1:
+                yield i
+                i += 1
+            if j & 1:
+                j -= 1
+                yield j
+            i //= 2
+            j //= 2
+
+    def stabbed(self, i: int, j: int, v: int, strict: bool) -> bool:
+        # Any edge in [i, j) with lo < v < hi (strict) or lo <= v <= hi.
+        for node in self._nodes(i, j):
+            k = (bisect_left if strict else bisect_right)(self.los[node], v)
+            if k and (self.reach[node][k - 1] > v if strict else self.reach[node][k - 1] >= v):
+                return True
+        return False
+
+    def count_spanning(self, i: int, j: int, v: int) -> int:
+        # Edges in [i, j) with lo <= v < hi.
+        return sum(
+            bisect_right(self.los[node], v) - bisect_right(self.his[node], v) for node in self._nodes(i, j)
+        )
+
+
+class PolygonIndex:
+    """Rectilinear polygon edges pre-split into vertical and horizontal EdgeTrees.
+
+    Built once per input; point and rectangle queries cost O(log^2 n) instead
+    of rescanning the whole polygon, with the same results as point_in_polygon
+    and rectangle_inside.
+    """
+
+    def __init__(self, poly: List[Tuple[int, int]]) -> None:
+        vertical: List[Tuple[int, int, int]] = []  # (x, y_lo, y_hi)
+        horizontal: List[Tuple[int, int, int]] = []  # (y, x_lo, x_hi)
+        n = len(poly)
+        for i in range(n):
+            (ax, ay), (bx, by) = poly[i], poly[(i + 1) % n]
+            if ay == by:
+                horizontal.append((ay, min(ax, bx), max(ax, bx)))
+            elif ax == bx:
+                vertical.append((ax, min(ay, by), max(ay, by)))
+            else:
+                raise ValueError(f"Edge is not axis-aligned: {poly[i]} -> {poly[(i + 1) % n]}")
+
+        vertical.sort()
+        horizontal.sort()
+        self.vertical = EdgeTree(vertical)
+        self.horizontal = EdgeTree(horizontal)
+
+    def on_boundary(self, px: int, py: int) -> bool:
+        v, h = self.vertical, self.horizontal
+        if v.stabbed(bisect_left(v.keys, px), bisect_right(v.keys, px), py, strict=False):
+            return True
+        return h.stabbed(bisect_left(h.keys, py), bisect_right(h.keys, py), px, strict=False)
+
+    def contains_point(self, px: int, py: int) -> bool:
+        # Even-odd rule; counts boundary as inside. Crossings are the vertical
+        # edges at x >= px whose half-open span [y_lo, y_hi) holds py.
+        if self.on_boundary(px, py):
+            return True
+        v = self.vertical
+        return v.count_spanning(bisect_left(v.keys, px), len(v.keys), py) % 2 == 1
+
+    def rectangle_inside(self, rect_corners: List[Tuple[int, int]]) -> bool:
+        for x, y in rect_corners:
+            if not self.contains_point(x, y):
+                return False
+
+        v, h = self.vertical, self.horizontal
+        n = len(rect_corners)
+        for k in range(n):
+            (ax, ay), (bx, by) = rect_corners[k], rect_corners[(k + 1) % n]
+            if ax == bx:
+                # Vertical edge vs horizontal polygon edges strictly inside its y-span.
+                y_lo, y_hi = sorted((ay, by))
+                if h.stabbed(bisect_right(h.keys, y_lo), bisect_left(h.keys, y_hi), ax, strict=True):
+                    return False
+            else:
+                # Horizontal edge vs vertical polygon edges strictly inside its x-span.
+                x_lo, x_hi = sorted((ax, bx))
+                if v.stabbed(bisect_right(v.keys, x_lo), bisect_left(v.keys, x_hi), ay, strict=True):
+                    return False
+
+        return True
+
+
+def compress_axis(values: List[int]) -> Tuple[Dict[int, int], int]:
+    # One cell per distinct coordinate, plus one cell for each non-empty gap between them.
+    index: Dict[int, int] = {}
+    cells = 0
+    prev = None
+    for v in sorted(set(values)):
+        if prev is not None and v > prev + 1:
+            cells += 1
+        index[v] = cells
+        cells += 1
+        prev = v
+    return index, cells
+
+
+class CompressedGrid:
+    """Coordinate-compressed red/green tile map with O(1) rectangle queries.
+
+    Every compressed cell is a block of tiles that are uniformly inside/on the
+    polygon or outside it, so a rectangle is fully red/green iff it covers no
+    outside cell; a 2D prefix sum over outside cells answers that in O(1).
+    """
+
+    def __init__(self, poly: List[Tuple[int, int]]) -> None:
+        self.xidx, w = compress_axis([x for x, _ in poly])
+        self.yidx, h = compress_axis([y for _, y in poly])
+
+        horizontal: List[Tuple[int, int, int]] = []  # (row, c0, c1)
+        vertical: List[Tuple[int, int, int]] = []  # (col, r0, r1)
+        n = len(poly)
+        for i in range(n):
+            (ax, ay), (bx, by) = poly[i], poly[(i + 1) % n]
+            if ay == by:
+                c0, c1 = sorted((self.xidx[ax], self.xidx[bx]))
+                horizontal.append((self.yidx[ay], c0, c1))
+            elif ax == bx:
+                r0, r1 = sorted((self.yidx[ay], self.yidx[by]))
+                vertical.append((self.xidx[ax], r0, r1))
+            else:
+                raise ValueError(f"Edge is not axis-aligned: {poly[i]} -> {poly[(i + 1) % n]}")
+
+        # A tile off the boundary is inside iff the point half a tile below it is,
+        # so the even-odd crossings for row r come from vertical edges spanning [r0, r1).
+        if np is not None:
+            self.pref = self._build_np(h, w, horizontal, vertical)
+        else:
+            self.pref = self._build_py(h, w, horizontal, vertical)
+
+    @staticmethod
+    def _build_np(h: int, w: int, horizontal, vertical):
+        toggle = np.zeros((h, w + 1), dtype=np.uint8)
+        boundary = np.zeros((h, w), dtype=np.uint8)
+        for row, c0, c1 in horizontal:
+            boundary[row, c0 : c1 + 1] = 1
+        for col, r0, r1 in vertical:
+            boundary[r0 : r1 + 1, col] = 1
+            toggle[r0:r1, col + 1] ^= 1
+
+        parity = np.bitwise_xor.accumulate(toggle[:, :w], axis=1)
+        outside = ((parity | boundary) == 0).astype(np.int32)
+        pref = np.zeros((h + 1, w + 1), dtype=np.int32)
+        pref[1:, 1:] = outside.cumsum(axis=0).cumsum(axis=1)
+        return pref.tolist()
+
+    @staticmethod
+    def _build_py(h: int, w: int, horizontal, vertical) -> List[List[int]]:
+        toggle = [bytearray(w + 1) for _ in range(h)]
+        boundary = [bytearray(w) for _ in range(h)]
+        for row, c0, c1 in horizontal:
+            boundary[row][c0 : c1 + 1] = b"\x01" * (c1 - c0 + 1)
+        for col, r0, r1 in vertical:
+            for r in range(r0, r1 + 1):
+                boundary[r][col] = 1
+            for r in range(r0, r1):
+                toggle[r][col + 1] ^= 1
+
+        pref = [[0] * (w + 1)]
+        for r in range(h):
+            above = pref[r]
+            row = [0] * (w + 1)
+            tog = toggle[r]
+            bnd = boundary[r]
+            parity = 0
+            run = 0
+            for c in range(w):
+                parity ^= tog[c]
+                if not (parity or bnd[c]):
+                    run += 1
+                row[c + 1] = above[c + 1] + run
+            pref.append(row)
+        return pref
+
+    def contains(self, x1: int, y1: int, x2: int, y2: int) -> bool:
+        """True if every tile of the rectangle spanned by two vertices is red/green."""
+        c0, c1 = sorted((self.xidx[x1], self.xidx[x2]))
+        r0, r1 = sorted((self.yidx[y1], self.yidx[y2]))
+        pref = self.pref
+        outside = pref[r1 + 1][c1 + 1] - pref[r0][c1 + 1] - pref[r1 + 1][c0] + pref[r0][c0]
+        return outside == 0
+
+
+def max_rectangle_area_rg_prefix(points: List[Tuple[int, int]]) -> int:
+    if not points:
+        return 0
+    grid = CompressedGrid(points)
+    best = 0
+    n = len(points)
+    for i in range(n):
+        x1, y1 = points[i]
+        for j in range(i + 1, n):
+            x2, y2 = points[j]
+            area = (abs(x1 - x2) + 1) * (abs(y1 - y2) + 1)
+            if area <= best:
+                continue
+            if x1 == x2 and y1 == y2:
+                continue
+            if grid.contains(x1, y1, x2, y2):
+                best = area
+    return best
+
+
+def max_rectangle_area_rg(points: List[Tuple[int, int]], index: Optional[PolygonIndex] = None) -> int:
     # Build polygon from point order (wrap) representing red/green boundary.
-    poly = points
+    if index is None:
+        index = PolygonIndex(points)
     best = 0
     n = len(points)
     for i in range(n):
@@ -129,7 +427,7 @@ def max_rectangle_area_rg(points: List[Tuple[int, int]]) -> int:
                 (x2, y2),
                 (x1, y2),
             ]
-            if rectangle_inside(poly, rect):
+            if index.rectangle_inside(rect):
                 best = area
     return best
 
@@ -138,7 +436,12 @@ def main() -> None:
     lines = sys.stdin.read().splitlines()
     points = parse_points(lines)
     if "--part2" in sys.argv:
-        print(max_rectangle_area_rg(points))
+        if "--prefix" in sys.argv:
+            print(max_rectangle_area_rg_prefix(points))
+        else:
+            print(max_rectangle_area_rg(points))
+    elif "--hull" in sys.argv:
+        print(max_rectangle_area_hull(points))
     else:
         print(max_rectangle_area(points))
 
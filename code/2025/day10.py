@@ -1,26 +1,463 @@
-import z3
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from math import ceil, floor, gcd, lcm
+import json
+import os
+import sys
 
-def day10(puzzle_input):
+# min_presses_parity builds a 2^n subset table, so past this many buttons
+# min_presses switches to elimination + branch-and-bound.
+PARITY_MAX_BUTTONS = 7
+EPS = 1e-7
+
+
+def parse_machine(line):
+    lights, *buttons, joltages = line.split()
+    buttons = [[int(j) for j in btn[1:-1].split(",") if j] for btn in buttons]
+    joltages = list(map(int, joltages[1:-1].split(",")))
+    return lights, buttons, joltages
+
+
+def min_toggle_presses(lights, buttons):
+    """
+    Fewest presses to reach the indicator-light pattern from all-off. Over GF(2)
+    each button is pressed 0 or 1 times, so this is the minimum-weight solution
+    of A x = target: XOR elimination gives one solution plus a null-space basis,
+    and every combination of the basis is tried.
+    """
+    m, n = len(lights), len(buttons)
+    target = sum(1 << j for j, ch in enumerate(lights) if ch == "#")
+    masks = [sum(1 << j for j in btn) for btn in buttons]
+
+    # One equation per light: (bitmask over buttons, rhs bit).
+    rows = [(sum(1 << i for i in range(n) if masks[i] >> j & 1), target >> j & 1) for j in range(m)]
+
+    pivots = []
+    r = 0
+    for c in range(n):
+        p = next((p for p in range(r, m) if rows[p][0] >> c & 1), None)
+        if p is None:
+            continue
+        rows[r], rows[p] = rows[p], rows[r]
+        for q in range(m):
+            if q != r and rows[q][0] >> c & 1:
+                rows[q] = (rows[q][0] ^ rows[r][0], rows[q][1] ^ rows[r][1])
+        pivots.append(c)
+        r += 1
+    if any(rhs for _, rhs in rows[r:]):
+        raise ValueError("No solution")
+
+    solution = 0
+    for k, c in enumerate(pivots):
+        if rows[k][1]:
+            solution |= 1 << c
+    pivot_set = set(pivots)
+    basis = []
+    for f in range(n):
+        if f in pivot_set:
+            continue
+        v = 1 << f
+        for k, c in enumerate(pivots):
+            if rows[k][0] >> f & 1:
+                v |= 1 << c
+        basis.append(v)
+
+    # Walk all 2^k null-space combinations in Gray-code order, one XOR per step.
+    best = solution.bit_count()
+    x = solution
+    for step in range(1, 1 << len(basis)):
+        x ^= basis[(step & -step).bit_length() - 1]
+        best = min(best, x.bit_count())
+    return best
+
+
+def part1(puzzle_input):
     total_presses = 0
     for line in puzzle_input.splitlines():
-        _, *buttons, joltages = line.split()
-        joltages = list(map(int, joltages[1:-1].split(',')))
-        solver = z3.Optimize()
-        button_presses = z3.IntVector("button_presses", len(buttons))
-
-        button_indices = defaultdict(list)
-        for i, btn in enumerate(buttons):
-            solver.add(button_presses[i] >= 0)
-            for j in btn[1:-1].split(','):
-                button_indices[int(j)].append(i)
-
-        for j, indices in button_indices.items():
-            solver.add(joltages[j] == sum(button_presses[i] for i in indices))
-
-        presses = z3.Sum(button_presses)
-        solver.minimize(presses)
-        solver.check()
-        total_presses += solver.model().eval(presses).as_long()
-    
+        if not line.strip():
+            continue
+        lights, buttons, _ = parse_machine(line)
+        total_presses += min_toggle_presses(lights[1:-1], buttons)
     return total_presses
+
+
+def min_presses(buttons, joltages):
+    """
+    Minimize total presses subject to A x = joltages, x >= 0 integer, where
+    column i of A is the 0/1 indicator of the counters button i bumps.
+    """
+    if len(buttons) <= PARITY_MAX_BUTTONS:
+        return min_presses_parity(buttons, joltages)
+    return min_presses_elimination(buttons, joltages)
+
+
+def min_presses_parity(buttons, joltages):
+    """
+    min_presses for few buttons. Any press vector splits as x = s + 2y with s
+    in {0,1}^n. s must give every counter the parity of its target, and y
+    solves the same problem for the halved remainder, so the search halves the
+    targets at each level. Cost grows as 2^len(buttons).
+    """
+    m, n = len(joltages), len(buttons)
+
+    # Effect of pressing each subset of buttons once, grouped by parity pattern.
+    effects = [(0,) * m]
+    by_parity = {}
+    for mask in range(1 << n):
+        if mask:
+            low = (mask & -mask).bit_length() - 1
+            effect = list(effects[mask & (mask - 1)])
+            for j in buttons[low]:
+                effect[j] += 1
+            effects.append(tuple(effect))
+        effect = effects[mask]
+        by_parity.setdefault(tuple(e & 1 for e in effect), []).append((bin(mask).count("1"), effect))
+
+    memo = {}
+
+    def solve(target):
+        if not any(target):
+            return 0
+        if target in memo:
+            return memo[target]
+        best = None
+        for presses, effect in by_parity.get(tuple(t & 1 for t in target), ()):
+            if any(e > t for e, t in zip(effect, target)):
+                continue
+            rest = solve(tuple((t - e) // 2 for e, t in zip(effect, target)))
+            if rest is not None and (best is None or presses + 2 * rest < best):
+                best = presses + 2 * rest
+        memo[target] = best
+        return best
+
+    best = solve(tuple(joltages))
+    if best is None:
+        raise ValueError("No solution")
+    return best
+
+
+def _lp_min(c, rows, rhs):
+    """
+    min c.y subject to rows[i].y <= rhs[i], y >= 0, by dense two-phase simplex
+    with Bland's rule. Returns (value, y), or None if infeasible. The callers
+    always bound every y, so the LP is never unbounded.
+    """
+    m, k = len(rows), len(c)
+    aux = k + m
+    # Columns: y, one slack per row, the phase-1 variable, then the rhs.
+    table = [list(row) + [0.0] * m + [-1.0, float(h)] for row, h in zip(rows, rhs)]
+    for i in range(m):
+        table[i][k + i] = 1.0
+    basis = [k + i for i in range(m)]
+    cost = [float(v) for v in c] + [0.0] * (m + 2)
+    phase1 = [0.0] * (k + m) + [1.0, 0.0]
+
+    def pivot(r, col):
+        row = table[r]
+        inv = 1.0 / row[col]
+        row[:] = [v * inv for v in row]
+        for other in table + [cost, phase1]:
+            if other is not row and other[col]:
+                f = other[col]
+                other[:] = [a - f * b for a, b in zip(other, row)]
+        basis[r] = col
+
+    def run(obj, allowed):
+        while True:
+            col = next((j for j in range(allowed) if obj[j] < -EPS), None)
+            if col is None:
+                return
+            best = None
+            for i, row in enumerate(table):
+                if row[col] > EPS:
+                    ratio = row[-1] / row[col]
+                    if best is None or ratio < best[0] - EPS or (ratio < best[0] + EPS and basis[i] < basis[best[1]]):
+                        best = (ratio, i)
+            pivot(best[1], col)
+
+    if m and min(row[-1] for row in table) < -EPS:
+        # Bring the phase-1 variable in on the most violated row; that makes
+        # every rhs nonnegative, then drive it back to zero.
+        pivot(min(range(m), key=lambda i: table[i][-1]), aux)
+        run(phase1, aux + 1)
+        if -phase1[-1] > EPS:
+            return None
+        if aux in basis:
+            r = basis.index(aux)
+            col = next((j for j in range(aux) if abs(table[r][j]) > EPS), None)
+            if col is not None:
+                pivot(r, col)
+    for row in table:
+        row[aux] = 0.0
+    run(cost, aux)
+
+    y = [0.0] * k
+    for i, col in enumerate(basis):
+        if col < k:
+            y[col] = table[i][-1]
+    return sum(cv * yv for cv, yv in zip(c, y)), y
+
+
+def min_presses_elimination(buttons, joltages):
+    """
+    min_presses by Gaussian elimination over the rationals, then
+    branch-and-bound over the free variables only (buttons minus rank of them).
+    Every pivot press count is an affine function of the free ones. The search
+    fixes free presses one at a time, walking outward from the LP-relaxation
+    optimum while the relaxation bound still beats the best total found, and
+    solves the last free press in closed form.
+    """
+    # Identical buttons are interchangeable, so keep one of each.
+    buttons = list(dict.fromkeys(tuple(sorted(set(btn))) for btn in buttons))
+    m, n = len(joltages), len(buttons)
+    rows = [[Fraction(int(j in btn)) for btn in buttons] + [Fraction(joltages[j])] for j in range(m)]
+
+    pivots = []
+    r = 0
+    for c in range(n):
+        p = next((p for p in range(r, m) if rows[p][c]), None)
+        if p is None:
+            continue
+        rows[r], rows[p] = rows[p], rows[r]
+        rows[r] = [v / rows[r][c] for v in rows[r]]
+        for q in range(m):
+            if q != r and rows[q][c]:
+                f = rows[q][c]
+                rows[q] = [a - f * b for a, b in zip(rows[q], rows[r])]
+        pivots.append(c)
+        r += 1
+    if any(row[-1] for row in rows[r:]):
+        raise ValueError("No solution")
+
+    pivot_set = set(pivots)
+    free = [c for c in range(n) if c not in pivot_set]
+    k = len(free)
+
+    # Pivot press count p is (rhs - a.y) / d over the free presses y, in integers.
+    coefs, denoms, rhs0 = [], [], []
+    for row in rows[:r]:
+        d = lcm(*(v.denominator for v in row))
+        coefs.append([int(row[f] * d) for f in free])
+        denoms.append(d)
+        rhs0.append(int(row[-1] * d))
+
+    # Total presses = sum(y) + sum((rhs - a.y) / d), so free press i costs c[i].
+    c = [1 - sum(Fraction(a[i], d) for a, d in zip(coefs, denoms)) for i in range(k)]
+    # A button can't be pressed more often than any counter it bumps allows.
+    upper = [min((joltages[j] for j in buttons[f]), default=0) for f in free]
+    best = None
+
+    def total_bound(rhs, pressed):
+        return pressed + sum(Fraction(v, d) for v, d in zip(rhs, denoms))
+
+    def last(rhs, pressed):
+        # One free press t left: an interval from the pivots staying >= 0, and
+        # congruences for them being integers. Returns False once even the
+        # real interval is empty or can't beat best, so the caller stops.
+        nonlocal best
+        i = k - 1
+        lo, hi = Fraction(0), Fraction(upper[i])
+        for a, v in zip(coefs, rhs):
+            if a[i] > 0:
+                hi = min(hi, Fraction(v, a[i]))
+            elif a[i] < 0:
+                lo = max(lo, Fraction(v, a[i]))
+            elif v < 0:
+                return False
+        if lo > hi:
+            return False
+        base = total_bound(rhs, pressed)
+        if best is not None and ceil(base + c[i] * (lo if c[i] >= 0 else hi)) >= best:
+            return False
+
+        # The congruences repeat with this period, so one period from the
+        # cheaper end finds the best t if there is one.
+        period = lcm(*(d // gcd(a[i], d) for a, d in zip(coefs, denoms)))
+        lo, hi = ceil(lo), floor(hi)
+        ts = range(lo, min(hi, lo + period - 1) + 1) if c[i] >= 0 else range(hi, max(lo, hi - period + 1) - 1, -1)
+        for t in ts:
+            if all((v - a[i] * t) % d == 0 for a, v, d in zip(coefs, rhs, denoms)):
+                total = base + c[i] * t
+                if best is None or total < best:
+                    best = int(total)
+                break
+        return True
+
+    def search(i, rhs, pressed):
+        # Free presses before i are fixed; rhs and pressed already include them.
+        if i == k - 1:
+            return last(rhs, pressed)
+        rows = [[float(x) for x in a[i:]] for a in coefs]
+        bounds = list(rhs)
+        for j in range(i, k):
+            rows.append([float(j == jj) for jj in range(i, k)])
+            bounds.append(upper[j])
+        result = _lp_min([float(x) for x in c[i:]], rows, bounds)
+        if result is None:
+            return False
+        value, y = result
+        if best is not None and ceil(float(total_bound(rhs, pressed)) + value - EPS) >= best:
+            return False
+
+        # The relaxation bound is convex in y[i], so walk away from its
+        # optimum in each direction until a child is infeasible or pruned.
+        start = min(floor(y[0] + EPS), upper[i])
+        for t in range(start, -1, -1):
+            if not search(i + 1, [v - a[i] * t for a, v in zip(coefs, rhs)], pressed + t):
+                break
+        for t in range(start + 1, upper[i] + 1):
+            if not search(i + 1, [v - a[i] * t for a, v in zip(coefs, rhs)], pressed + t):
+                break
+        return True
+
+    if k == 0:
+        if all(v >= 0 and v % d == 0 for v, d in zip(rhs0, denoms)):
+            best = sum(v // d for v, d in zip(rhs0, denoms))
+    else:
+        search(0, rhs0, 0)
+    if best is None:
+        raise ValueError("No solution")
+    return best
+
+
+def min_presses_z3(buttons, joltages):
+    import z3
+
+    solver = z3.Optimize()
+    button_presses = z3.IntVector("button_presses", len(buttons))
+
+    button_indices = defaultdict(list)
+    for i, btn in enumerate(buttons):
+        solver.add(button_presses[i] >= 0)
+        for j in btn:
+            button_indices[j].append(i)
+
+    for j, indices in button_indices.items():
+        solver.add(joltages[j] == sum(button_presses[i] for i in indices))
+
+    presses = z3.Sum(button_presses)
+    solver.minimize(presses)
+    solver.check()
+    return solver.model().eval(presses).as_long()
+
+
+def normalize(buttons, joltages):
+    # Button order and index order within a button don't change the answer.
+    return tuple(sorted(tuple(sorted(btn)) for btn in buttons)), tuple(joltages)
+
+
+def _solve_key(key):
+    buttons, joltages = key
+    return min_presses(buttons, joltages)
+
+
+def solve_batch(machines, jobs=1, cache=None):
+    """
+    Minimum presses for each (buttons, joltages) machine. Identical machines are
+    solved once via cache (pass the same dict across calls to share it), and with
+    jobs > 1 the distinct unsolved ones are spread over a process pool.
+    """
+    if cache is None:
+        cache = {}
+    keys = [normalize(buttons, joltages) for buttons, joltages in machines]
+    todo = list(dict.fromkeys(k for k in keys if k not in cache))
+
+    if jobs > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunk = max(1, len(todo) // (jobs * 4))
+            for key, presses in zip(todo, pool.map(_solve_key, todo, chunksize=chunk)):
+                cache[key] = presses
+    else:
+        for key in todo:
+            cache[key] = _solve_key(key)
+
+    return [cache[k] for k in keys]
+
+
+def load_cache(path):
+    # Solutions persisted by save_cache, keyed like normalize(); a missing file is an empty cache.
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {(tuple(map(tuple, buttons)), tuple(joltages)): presses for buttons, joltages, presses in json.load(f)}
+
+
+def save_cache(cache, path):
+    # Write to a temporary file first so an interrupted run can't leave a truncated cache.
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump([[buttons, joltages, presses] for (buttons, joltages), presses in cache.items()], f)
+    os.replace(tmp, path)
+
+
+def day10(puzzle_input, engine="native", jobs=1, cache=None):
+    # engine: "native" (default, no z3 import), "z3", or "check" to run both and compare.
+    if jobs > 1 and engine != "native":
+        raise ValueError(f"jobs > 1 only applies to the native engine, not {engine}")
+    machines = []
+    for line in puzzle_input.splitlines():
+        if not line.strip():
+            continue
+        _, buttons, joltages = parse_machine(line)
+        machines.append((buttons, joltages))
+
+    if engine == "native":
+        return sum(solve_batch(machines, jobs, cache))
+
+    total_presses = 0
+    for buttons, joltages in machines:
+        if engine == "z3":
+            total_presses += min_presses_z3(buttons, joltages)
+            continue
+        presses = min_presses(buttons, joltages)
+        expected = min_presses_z3(buttons, joltages)
+        if presses != expected:
+            raise ValueError(f"Native solver gave {presses}, z3 gave {expected}: {buttons} {joltages}")
+        total_presses += presses
+
+    return total_presses
+
+
+def main():
+    # Usage: day10.py [--part1 | --z3 | --check] [--jobs N] [--cache FILE] [INPUT ...]
+    # Reads stdin when no INPUT is given. All inputs share one solution cache,
+    # which --cache also loads from and saves back to FILE.
+    args = sys.argv[1:]
+    engine = "native"
+    if "--z3" in args:
+        engine = "z3"
+    elif "--check" in args:
+        engine = "check"
+    jobs = int(args[args.index("--jobs") + 1]) if "--jobs" in args else 1
+    cache_path = args[args.index("--cache") + 1] if "--cache" in args else None
+    if jobs > 1 and engine != "native":
+        sys.exit(f"--jobs only applies to the native engine, not --{engine}")
+
+    paths = []
+    rest = iter(args)
+    for arg in rest:
+        if arg in ("--jobs", "--cache"):
+            next(rest)  # the flag's value
+        elif not arg.startswith("--"):
+            paths.append(arg)
+    cache = load_cache(cache_path) if cache_path else {}
+
+    for path in paths or [None]:
+        if path is None:
+            puzzle_input = sys.stdin.read()
+        else:
+            with open(path) as f:
+                puzzle_input = f.read()
+        if "--part1" in args:
+            answer = part1(puzzle_input)
+        else:
+            answer = day10(puzzle_input, engine, jobs, cache)
+        print(f"{path}: {answer}" if len(paths) > 1 else answer)
+
+    if cache_path:
+        save_cache(cache, cache_path)
+
+
+if __name__ == "__main__":
+    main()
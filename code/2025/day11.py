@@ -1,4 +1,4 @@
-from collections import defaultdict
+from collections import defaultdict, deque
 import sys
 
 
@@ -26,6 +26,107 @@ def count_paths_between(graph, start, target, memo):
     return total
 
 
+class PathCounter:
+    """Iterative path counting on a DAG via one topological order (Kahn's algorithm).
+
+    Node names are interned to integer ids; counts from a source to every node are
+    computed in a single forward pass and cached per source.
+    """
+
+    def __init__(self, graph):
+        self.ids = {}
+        self.adj = []
+        for node, outs in graph.items():
+            u = self._intern(node)
+            self.adj[u].extend(self._intern(v) for v in outs)
+
+        n = len(self.adj)
+        indeg = [0] * n
+        for outs in self.adj:
+            for v in outs:
+                indeg[v] += 1
+        q = deque(u for u in range(n) if indeg[u] == 0)
+        self.order = []
+        while q:
+            u = q.popleft()
+            self.order.append(u)
+            for v in self.adj[u]:
+                indeg[v] -= 1
+                if indeg[v] == 0:
+                    q.append(v)
+        if len(self.order) != n:
+            raise ValueError("Graph has a cycle")
+
+        self.pos = [0] * n
+        for i, u in enumerate(self.order):
+            self.pos[u] = i
+        self.cache = {}
+
+    def _intern(self, name):
+        u = self.ids.get(name)
+        if u is None:
+            u = self.ids[name] = len(self.adj)
+            self.adj.append([])
+        return u
+
+    def counts_from(self, source):
+        # Number of paths from source to every node, indexed by node id.
+        u = self.ids[source]
+        counts = self.cache.get(u)
+        if counts is None:
+            counts = [0] * len(self.adj)
+            counts[u] = 1
+            for v in self.order[self.pos[u]:]:
+                c = counts[v]
+                if c:
+                    for w in self.adj[v]:
+                        counts[w] += c
+            self.cache[u] = counts
+        return counts
+
+    def count(self, start, target):
+        if start == target:
+            return 1
+        if start not in self.ids or target not in self.ids:
+            return 0
+        return self.counts_from(start)[self.ids[target]]
+
+    def count_through(self, waypoints):
+        # Paths visiting the waypoints in the given order.
+        total = 1
+        for a, b in zip(waypoints, waypoints[1:]):
+            total *= self.count(a, b)
+            if not total:
+                break
+        return total
+
+    def count_visiting(self, start, target, required):
+        # Paths start -> target visiting every required node in any order: a DP over
+        # the topological order with a bitmask of waypoints seen so far, O(E * 2^k).
+        required = list(dict.fromkeys(required))
+        if start == target:
+            return 1 if all(r == start for r in required) else 0
+        if any(name not in self.ids for name in [start, target, *required]):
+            return 0
+
+        bit = {self.ids[name]: 1 << i for i, name in enumerate(required)}
+        full = (1 << len(required)) - 1
+        s, t = self.ids[start], self.ids[target]
+        dp = {s: {bit.get(s, 0): 1}}
+        for v in self.order[self.pos[s]:]:
+            states = dp.pop(v, None)
+            if not states:
+                continue
+            if v == t:
+                return states.get(full, 0)
+            for w in self.adj[v]:
+                b = bit.get(w, 0)
+                nxt = dp.setdefault(w, {})
+                for mask, c in states.items():
+                    nxt[mask | b] = nxt.get(mask | b, 0) + c
+        return 0
+
+
 def solve_part1(lines):
     graph = build_graph(lines)
     return count_paths_between(graph, "you", "out", {})
@@ -49,12 +150,26 @@ def solve_part2(lines):
     return path_dac_fft + path_fft_dac
 
 
+def solve_part1_topo(lines):
+    return PathCounter(build_graph(lines)).count("you", "out")
+
+
+def solve_part2_topo(lines, required=("dac", "fft")):
+    return PathCounter(build_graph(lines)).count_visiting("svr", "out", required)
+
+
 def main():
     lines = sys.stdin.read().splitlines()
+    topo = "--topo" in sys.argv
+    # --via=a,b,c overrides the required waypoints for part 2 (implies --topo).
+    via = [arg[len("--via="):] for arg in sys.argv if arg.startswith("--via=")]
     if "--part2" in sys.argv:
-        print(solve_part2(lines))
+        if via:
+            print(solve_part2_topo(lines, [n for n in via[-1].split(",") if n]))
+        else:
+            print(solve_part2_topo(lines) if topo else solve_part2(lines))
     else:
-        print(solve_part1(lines))
+        print(solve_part1_topo(lines) if topo else solve_part1(lines))
 
 
 if __name__ == "__main__":
@@ -1,4 +1,7 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from os import environ
+import signal
 import sys
 
 # Increase recursion depth for deep backtracking on large grids
@@ -97,67 +100,87 @@ def is_space_sufficient(grid, width, height, required_area, min_item_area, slack
     if free_area > required_area + slack:
         return True
 
-    # Floodffill to calculate usable connected area
-    visited = set()
-    usable_free_area = 0
-
-    # Map occupied cells for BFS
-    collision = set()
+    # Flood fill on bitmasks: pack rows with a zero guard column between them so
+    # horizontal shifts can't wrap, then grow each island by shift-and-mask.
+    stride = width + 1
+    row_full = (1 << width) - 1
+    free = 0
     for r in range(height):
-        row_val = grid[r]
-        if row_val == 0:
-            continue
-        for c in range(width):
-            if (row_val >> (width - 1 - c)) & 1:
-                collision.add((r, c))
+        free |= (~grid[r] & row_full) << (r * stride)
 
-    for r in range(height):
-        for c in range(width):
-            if (r, c) not in collision and (r, c) not in visited:
-                # Found a new empty island
-                q = [(r, c)]
-                visited.add((r, c))
-                island_size = 0
-                idx = 0
-                while idx < len(q):
-                    curr_r, curr_c = q[idx]
-                    idx += 1
-                    island_size += 1
-
-                    for nr, nc in ((curr_r + 1, curr_c), (curr_r - 1, curr_c), (curr_r, curr_c + 1), (curr_r, curr_c - 1)):
-                        if 0 <= nr < height and 0 <= nc < width:
-                            if (nr, nc) not in collision and (nr, nc) not in visited:
-                                visited.add((nr, nc))
-                                q.append((nr, nc))
-
-                # Pruning: Only count island if it fits the smallest remaining item
-                if island_size >= min_item_area:
-                    usable_free_area += island_size
-
-                if usable_free_area >= required_area:
-                    return True
+    usable_free_area = 0
+    while free:
+        island = free & -free
+        while True:
+            grown = (island | (island << 1) | (island >> 1) | (island << stride) | (island >> stride)) & free
+            if grown == island:
+                break
+            island = grown
+        free &= ~island
+
+        # Pruning: Only count island if it fits the smallest remaining item
+        island_size = island.bit_count()
+        if island_size >= min_item_area:
+            usable_free_area += island_size
+
+        if usable_free_area >= required_area:
+            return True
 
     return usable_free_area >= required_area
 
 
-def solve_recursive(grid, items, item_idx, width, height, variations, min_global_area):
+DEFAULT_CACHE_SIZE = 100_000
+
+
+class FailureCache:
+    """Bounded LRU set of search states proven to have no completion."""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, key):
+        self.entries[key] = None
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+def solve_recursive(grid, items, item_idx, width, height, variations, min_global_area, cache=None):
     if item_idx == len(items):
         return True
 
     item = items[item_idx]
     sid = item["id"]
 
-    # Pruning: Check if grid state allows fitting remaining items
-    remaining_area_needed = sum(it["area"] for it in items[item_idx:])
-    if not is_space_sufficient(grid, width, height, remaining_area_needed, min_global_area):
-        return False
-
     # Symmetry breaking: if current item is identical to previous,
     # force placement to start after previous item's position
     start_r, start_c = 0, 0
     if item_idx > 0 and items[item_idx - 1]["id"] == sid:
         start_r, start_c = items[item_idx - 1]["placed_r"], items[item_idx - 1]["placed_c"]
 
+    # Transposition check: the start position is part of the state, since a
+    # board that is dead past one start may still be solvable from an earlier one
+    if cache is not None:
+        key = (tuple(grid), item_idx, start_r, start_c)
+        if key in cache:
+            return False
+
+    # Pruning: Check if grid state allows fitting remaining items
+    remaining_area_needed = sum(it["area"] for it in items[item_idx:])
+    if not is_space_sufficient(grid, width, height, remaining_area_needed, min_global_area):
+        return False
+
     for h_var, w_var, rows in variations[sid]:
         # Iterate over valid grid positions
         for r in range(start_r, height - h_var + 1):
@@ -183,53 +206,289 @@ def solve_recursive(grid, items, item_idx, width, height, variations, min_global
                     item["placed_r"], item["placed_c"] = r, c
 
                     # 3 - recurse
-                    if solve_recursive(grid, items, item_idx + 1, width, height, variations, min_global_area):
+                    if solve_recursive(grid, items, item_idx + 1, width, height, variations, min_global_area, cache):
                         return True
 
                     # 4 - backtrack (remove shape)
                     for i in range(h_var):
                         grid[r + i] ^= rows[i] << shift
 
+    if cache is not None:
+        cache.add(key)
     return False
 
 
-def part1(lines):
+def build_placements(variations, width, height):
+    """Every legal placement of every shape variation as a whole-board bitmask.
+
+    Cell (r, c) is bit r * width + c; placements are grouped by their first
+    (lowest) cell so the search can look up exactly those covering a given cell.
+    """
+    placements = {}
+    for sid, shape_vars in variations.items():
+        by_anchor = [[] for _ in range(width * height)]
+        for h_var, w_var, rows in shape_vars:
+            if h_var > height or w_var > width:
+                continue
+            base = 0
+            for i in range(h_var):
+                for j in range(w_var):
+                    if (rows[i] >> (w_var - 1 - j)) & 1:
+                        base |= 1 << (i * width + j)
+            first = (base & -base).bit_length() - 1
+            for r in range(height - h_var + 1):
+                for c in range(width - w_var + 1):
+                    offset = r * width + c
+                    by_anchor[first + offset].append(base << offset)
+        placements[sid] = by_anchor
+    return placements
+
+
+def solve_bitboard(width, height, counts, shape_areas, placements):
+    """Exact search filling the first empty cell: cover it with a placement or leave it empty.
+
+    Leaving a cell empty spends one unit of slack (free area minus area still to
+    place), so the remaining area is a running counter rather than a sum.
+    """
+    counts = list(counts)
+    remaining = sum(shape_areas[sid] * n for sid, n in enumerate(counts))
+    slack = width * height - remaining
+    if slack < 0:
+        return False
+    full = (1 << (width * height)) - 1
+    order = sorted((sid for sid, n in enumerate(counts) if n), key=lambda sid: -shape_areas[sid])
+
+    def place(board, remaining, slack):
+        if remaining == 0:
+            return True
+        free = ~board & full
+        anchor = (free & -free).bit_length() - 1
+
+        for sid in order:
+            if not counts[sid]:
+                continue
+            area = shape_areas[sid]
+            for mask in placements[sid][anchor]:
+                if board & mask:
+                    continue
+                counts[sid] -= 1
+                found = place(board | mask, remaining - area, slack)
+                counts[sid] += 1
+                if found:
+                    return True
+
+        return slack > 0 and place(board | (1 << anchor), remaining, slack - 1)
+
+    return place(0, remaining, slack)
+
+
+def shape_profiles(variations):
+    """Per-shape facts used by classify_region: area, 3x3 fit and checkerboard minimum."""
+    profiles = {}
+    for sid, shape_vars in variations.items():
+        area = sum(bin(r).count("1") for r in shape_vars[0][2])
+        fits_3x3 = any(h <= 3 and w <= 3 for h, w, _ in shape_vars)
+        # Fewest cells of a single checkerboard colour any placement can cover.
+        min_colour = area
+        for h_var, w_var, rows in shape_vars:
+            even = sum(
+                (rows[i] >> (w_var - 1 - j)) & 1 for i in range(h_var) for j in range(w_var) if (i + j) % 2 == 0
+            )
+            min_colour = min(min_colour, even, area - even)
+        profiles[sid] = {
+            "area": area,
+            "fits_3x3": fits_3x3,
+            "min_colour": min_colour,
+            "dims": [(h, w) for h, w, _ in shape_vars],
+        }
+    return profiles
+
+
+def classify_region(width, height, counts, profiles):
+    """
+    Answer a region without search where possible. Returns (verdict, stage), with
+    verdict None when only the search can decide.
+    """
+    present = [(sid, n) for sid, n in enumerate(counts) if n > 0]
+    if not present:
+        return True, "empty"
+
+    for sid, _ in present:
+        if not any(h <= height and w <= width for h, w in profiles[sid]["dims"]):
+            return False, "fit"
+
+    if sum(profiles[sid]["area"] * n for sid, n in present) > width * height:
+        return False, "area"
+
+    # Every placement covers at least min_colour cells of each checkerboard colour.
+    if sum(profiles[sid]["min_colour"] * n for sid, n in present) > (width * height) // 2:
+        return False, "parity"
+
+    # One present per disjoint 3x3 block is always a valid packing.
+    if all(profiles[sid]["fits_3x3"] for sid, _ in present):
+        if (width // 3) * (height // 3) >= sum(n for _, n in present):
+            return True, "blocks"
+
+    return None, "search"
+
+
+def solve_region(
+    width, height, counts, variations, shape_areas, engine="recursive", placements_cache=None, cache=None
+):
+    if engine == "bitboard":
+        # Placement masks depend only on the region size; share them across queries.
+        if placements_cache is None:
+            placements_cache = {}
+        if (width, height) not in placements_cache:
+            placements_cache[(width, height)] = build_placements(variations, width, height)
+        return solve_bitboard(width, height, counts, shape_areas, placements_cache[(width, height)])
+
+    # Construct flat list of items to place
+    items = []
+    for sid, count in enumerate(counts):
+        if count > 0:
+            area = shape_areas[sid]
+            for _ in range(count):
+                items.append({"id": sid, "area": area, "placed_r": 0, "placed_c": 0})
+
+    # Heuristic: Sort by area descending (largest first)
+    items.sort(key=lambda x: (-x["area"], x["id"]))
+
+    min_global_area = items[-1]["area"]  # Smallest item is last
+    grid = [0] * height
+    return solve_recursive(grid, items, 0, width, height, variations, min_global_area, cache)
+
+
+class RegionTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise RegionTimeout
+
+
+def solve_region_timed(width, height, counts, variations, shape_areas, engine, placements_cache, timeout, cache=None):
+    """solve_region, returning None ("unknown") if it runs past timeout seconds."""
+    if not timeout or not hasattr(signal, "setitimer"):
+        return solve_region(width, height, counts, variations, shape_areas, engine, placements_cache, cache)
+
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    result = None
+    try:
+        try:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+            result = solve_region(width, height, counts, variations, shape_areas, engine, placements_cache, cache)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    except RegionTimeout:
+        # Either the solve ran out of time, or the alarm fired just before the
+        # timer was disarmed; in that case the finished result is kept.
+        pass
+    finally:
+        signal.signal(signal.SIGALRM, previous)
+    return result
+
+
+# Per-process state for pool workers, shipped once through the initializer.
+_worker = {}
+
+
+def _run_region(width, height, counts, variations, shape_areas, engine, placements_cache, timeout, cache_size):
+    # Returns (result, cache hits, cache misses); each region gets its own failure cache.
+    cache = FailureCache(cache_size) if cache_size else None
+    result = solve_region_timed(width, height, counts, variations, shape_areas, engine, placements_cache, timeout, cache)
+    if cache is None:
+        return result, 0, 0
+    return result, cache.hits, cache.misses
+
+
+def _init_worker(variations, shape_areas, engine, timeout, cache_size):
+    _worker.update(
+        variations=variations,
+        shape_areas=shape_areas,
+        engine=engine,
+        timeout=timeout,
+        cache_size=cache_size,
+        placements={},
+    )
+
+
+def _solve_in_worker(width, height, counts):
+    w = _worker
+    return _run_region(
+        width,
+        height,
+        counts,
+        w["variations"],
+        w["shape_areas"],
+        w["engine"],
+        w["placements"],
+        w["timeout"],
+        w["cache_size"],
+    )
+
+
+def part1(lines, engine="recursive", stats=None, jobs=1, timeout=None, cache_size=DEFAULT_CACHE_SIZE):
     shapes, queries = parse_input(lines)
     variations = generate_variations(shapes)
 
     # Pre-calculate areas for all shapes
-    shape_areas = {sid: sum(bin(r).count("1") for r in vars[0][2]) for sid, vars in variations.items()}
+    profiles = shape_profiles(variations)
+    shape_areas = {sid: p["area"] for sid, p in profiles.items()}
 
     valid_count = 0
+    pending = []
 
     for width, height, counts in queries:
-        # Construct flat list of items to place
-        items = []
-        for sid, count in enumerate(counts):
-            if count > 0:
-                area = shape_areas[sid]
-                for _ in range(count):
-                    items.append({"id": sid, "area": area, "placed_r": 0, "placed_c": 0})
-
-        if not items:
-            valid_count += 1
-            continue
-
-        # Heuristic: Sort by area descending (largest first)
-        items.sort(key=lambda x: (-x["area"], x["id"]))
-
-        total_area = sum(i["area"] for i in items)
-        if total_area > width * height:
-            continue
-
-        min_global_area = items[-1]["area"]  # Smallest item is last
-        grid = [0] * height
-
-        if solve_recursive(grid, items, 0, width, height, variations, min_global_area):
-            valid_count += 1
+        verdict, stage = classify_region(width, height, counts, profiles)
+        if stats is not None:
+            stats[stage] = stats.get(stage, 0) + 1
+        if verdict is None:
+            pending.append((width, height, counts))
+        else:
+            valid_count += verdict
+
+    # Largest regions first so a long one doesn't start last and dominate wall time.
+    pending.sort(key=lambda q: (-q[0] * q[1], -sum(q[2])))
+
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(variations, shape_areas, engine, timeout, cache_size),
+        ) as pool:
+            futures = [pool.submit(_solve_in_worker, *q) for q in pending]
+            outcomes = [f.result() for f in futures]
+    else:
+        placements_cache = {}
+        outcomes = [
+            _run_region(w, h, counts, variations, shape_areas, engine, placements_cache, timeout, cache_size)
+            for w, h, counts in pending
+        ]
+
+    results = [r for r, _, _ in outcomes]
+    unknown = sum(1 for r in results if r is None)
+    if stats is not None:
+        if unknown:
+            stats["unknown"] = unknown
+        if cache_size and engine == "recursive" and outcomes:
+            stats["cache_hits"] = sum(h for _, h, _ in outcomes)
+            stats["cache_misses"] = sum(m for _, _, m in outcomes)
+    valid_count += sum(1 for r in results if r)
 
     return valid_count
 
 
 if __name__ == "__main__":
-    print(part1(open("12.sample.txt" if environ.get("DEBUG") else "12.txt").read().splitlines()))
+    engine = "bitboard" if "--bitboard" in sys.argv else "recursive"
+    jobs = int(sys.argv[sys.argv.index("--jobs") + 1]) if "--jobs" in sys.argv else 1
+    timeout = float(sys.argv[sys.argv.index("--timeout") + 1]) if "--timeout" in sys.argv else None
+    cache_size = int(sys.argv[sys.argv.index("--cache-size") + 1]) if "--cache-size" in sys.argv else DEFAULT_CACHE_SIZE
+    stats = {}
+    lines = open("12.sample.txt" if environ.get("DEBUG") else "12.txt").read().splitlines()
+    print(part1(lines, engine, stats, jobs, timeout, cache_size))
+    if "--stats" in sys.argv:
+        for stage, n in stats.items():
+            print(f"{stage}: {n}", file=sys.stderr)
+    elif stats.get("unknown"):
+        print(f"unknown (timed out): {stats['unknown']}", file=sys.stderr)